@@ -1,18 +1,132 @@
+import io
 import os
+import logging
 import re
-import uuid
+import sys
+import string
+import asyncio
+import hashlib
+import itertools
 import tempfile
+import threading
 from datetime import datetime
-from colorpaws import ColorPaws
-from google import generativeai as genai
-from markdown_pdf import MarkdownPdf, Section
-from google.generativeai.types import GenerationConfig
-from google.generativeai.types.helper_types import RequestOptions
+from collections import OrderedDict
+from aiolimiter import AsyncLimiter
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+
+_FENCES = re.compile(r'```[a-zA-Z]*\n|```\n?')
+_FILENAME_SANITIZE = re.compile(r'[^\w\-]')
+_FILENAME_TABLE = {c: c if chr(c).isalnum() or chr(c) in '_-' else ord('_') for c in range(128)}
+
+class _ColorFormatter(logging.Formatter):
+    """Log formatter that colors each record by its level"""
+    COLORS = {
+        logging.DEBUG: '\033[36m',
+        logging.INFO: '\033[32m',
+        logging.WARNING: '\033[33m',
+        logging.ERROR: '\033[31m',
+        logging.CRITICAL: '\033[35m',
+    }
+    
+    def format(self, record):
+        color = self.COLORS.get(record.levelno)
+        message = super().format(record)
+        return f"{color}{message}\033[0m" if color else message
+
+logger = logging.getLogger(__name__)
+
+def _setup_logging():
+    """Attach a console handler for the WebUI, unless the application already configured logging"""
+    if logger.handlers or logging.getLogger().handlers:
+        return
+    
+    handler = logging.StreamHandler(sys.stderr)
+    formatter = _ColorFormatter if sys.stderr is not None and sys.stderr.isatty() else logging.Formatter
+    handler.setFormatter(formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s', '%Y-%m-%d %H:%M:%S'))
+    logger.addHandler(handler)
+    if logger.level == logging.NOTSET:
+        logger.setLevel(logging.INFO)
+
+_LENGTHS = frozenset({'short', 'medium', 'long'})
+_TONES = frozenset({'scholarly', 'inspirational', 'practical', 'reflective', 'motivational', 'educational', 'historical', 'narrative'})
+_LANGUAGES = frozenset({'bahasa malaysia', 'arabic', 'english', 'mandarin', 'tamil'})
+
+_PROMPT_TEMPLATE = string.Template("You are an expert Islamic scholar in writing khutbahs. You are required to write a $length Friday khutbah (sermon) in $language on the topic on '$topic' with a $tone tone. Create a complete, well-structured Islamic khutbah that includes: 1. An appropriate title 2. Opening with praise to Allah and salutations on Prophet Muhammad (peace be upon him) 3. Introduction to the topic with relevant Quranic verses and Hadith 4. Main body with clear points, explanations, and guidance 5. Practical advice for the audience 6. Conclusion with a summary of key points 7. Closing duas (prayers) The khutbah should be scholarly yet accessible, with proper citations of Quranic verses and authentic Hadith. Write the ENTIRE khutbah in $language only, including the explanation and translation of Quranic verses and Hadith. Only include Arabic script for Quranic verses and Hadith, followed by their translation in $language. DO NOT mix the khutbah with other languages and copyrighted materials. DO NOT include any opening or closing remarks.")
+
+_KHUTBAH_CSS = """
+body {
+    font-family: 'Amiri', 'Segoe UI', sans-serif;
+    text-align: justify;
+    text-justify: inter-word;
+    line-height: 1.5;
+}
+
+/* Arabic text specific */
+[lang='ar'] {
+    direction: rtl;
+    font-family: 'Amiri', sans-serif;
+    font-size: 20px;
+    line-height: 1.8;
+}
+
+h1 {
+    text-align: center;
+    color: #2c3e50;
+    margin-top: 1.5em;
+    margin-bottom: 0.8em;
+    font-size: 1.5em;
+    font-weight: 600;
+}
+
+h2, h3, h4, h5, h6 {
+    color: #34495e;
+    margin-top: 1.5em;
+    margin-bottom: 0.8em;
+}
+
+blockquote {
+    background-color: #f9f9f9;
+    border-left: 4px solid #4CAF50;
+    padding: 10px 15px;
+    margin: 15px 0;
+    font-style: italic;
+}
+
+p {
+    margin: 0.8em 0;
+}
+"""
+
+_PDF_AUTHOR = "Ikmal Said"
+_PDF_CREATOR = "KhutbahMaker"
+
+_backoff = wait_exponential(multiplier=1, max=60)
+
+def _retry_wait(retry_state):
+    """Back off exponentially, or longer if the server sent a retry delay"""
+    delay = _backoff(retry_state)
+    error = retry_state.outcome.exception()
+    
+    for detail in getattr(error, 'details', None) or []:
+        retry_delay = getattr(detail, 'retry_delay', None)
+        if retry_delay is not None:
+            delay = max(delay, retry_delay.seconds + retry_delay.nanos / 1e9)
+    
+    return delay
+
+def _is_rate_limited(error):
+    """Check whether an AI request failed because of rate limiting"""
+    from google.api_core.exceptions import ResourceExhausted
+    return isinstance(error, ResourceExhausted)
+
+_retry_on_rate_limit = retry(retry=retry_if_exception(_is_rate_limited), wait=_retry_wait,
+                             stop=stop_after_attempt(5), reraise=True)
 
 class KhutbahMaker:
     """Copyright (C) 2025 Ikmal Said. All rights reserved"""
     
-    def __init__(self, mode='default', api_key=None, model='gemini-2.0-flash-thinking-exp-01-21', timeout=180):
+    def __init__(self, mode='default', api_key=None, model='gemini-2.0-flash-thinking-exp-01-21', timeout=180,
+                 rate_limit=10, cache_size=128):
         """
         Initialize KhutbahMaker module.
         
@@ -21,13 +135,23 @@ class KhutbahMaker:
             api_key (str): API key for AI services
             model (str): AI model to use
             timeout (int): Timeout for AI requests in seconds
+            rate_limit (int): Maximum AI requests per minute for async and batch generation
+            cache_size (int): Maximum number of generated khutbahs and PDFs kept in memory (0 to disable)
         """
-        self.logger = ColorPaws(name=self.__class__.__name__, log_on=True, log_to=None)
+        if mode == 'webui':
+            _setup_logging()
+        
         self.aigc_model = model
-        self.api_key = api_key
         self.timeout = timeout * 1000
+        self._rate_limiter = AsyncLimiter(max_rate=rate_limit, time_period=60)
+        self._cache = OrderedDict()
+        self._pdf_cache = OrderedDict()
+        self._cache_size = cache_size
+        self._cache_lock = threading.Lock()
+        self._task_counter = itertools.count()
+        self.set_api_key(api_key)
         
-        self.logger.info("KhutbahMaker is ready!")
+        logger.info("KhutbahMaker is ready!")
         
         if mode != 'default':
             if mode == 'webui':
@@ -35,185 +159,366 @@ class KhutbahMaker:
             else:
                 raise ValueError(f"Invalid startup mode: {mode}")
 
+    def set_api_key(self, api_key):
+        """
+        Set the API key. The AI model client is rebuilt on the next request.
+        
+        Parameters:
+            api_key (str): API key for AI services
+        """
+        self.api_key = api_key
+        self._model = None
+
+    def __get_model(self):
+        """Return the configured AI model, creating it on first use"""
+        if self._model is None:
+            from google import generativeai as genai
+            if self.api_key:
+                genai.configure(api_key=self.api_key)
+            self._model = genai.GenerativeModel(self.aigc_model)
+        return self._model
+
     def __clean_markdown(self, text):
         """Clean up markdown text"""
-        text = re.sub(r'```[a-zA-Z]*\n', '', text)
-        text = re.sub(r'```\n?', '', text)
-        return text.strip()
+        if '```' not in text:
+            return text.strip()
+        return _FENCES.sub('', text).strip()
+
+    def __cache_key(self, topic, length, tone, language):
+        """Build the response cache key for a khutbah request"""
+        params = (topic, length.lower(), tone.lower(), language.lower(), self.aigc_model)
+        return hashlib.sha1(repr(params).encode()).hexdigest()
+
+    def __cache_get(self, cache, key):
+        """Return a cached entry, or None if not cached"""
+        with self._cache_lock:
+            if key not in cache:
+                return None
+            cache.move_to_end(key)
+            return cache[key]
+
+    def __cache_put(self, cache, key, value):
+        """Store an entry in the cache, evicting the least recently used entry when full"""
+        if self._cache_size <= 0:
+            return
+        with self._cache_lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self._cache_size:
+                cache.popitem(last=False)
+
+    def __build_prompt(self, topic, length, tone, language):
+        """Build the khutbah prompt for the AI model"""
+        if length.lower() == 'short':
+            length = 'short (approximately 10-15 minutes)'
+        elif length.lower() == 'medium':
+            length = 'medium (approximately 15-20 minutes)'
+        elif length.lower() == 'long':
+            length = 'long (approximately 20-30 minutes)'
+
+        return _PROMPT_TEMPLATE.substitute(length=length, language=language, topic=topic, tone=tone.lower())
+
+    @_retry_on_rate_limit
+    def __open_stream(self, prompt):
+        """Send the prompt to the AI model as a streamed request, retrying when rate limited"""
+        from google.generativeai.types import GenerationConfig
+        from google.generativeai.types.helper_types import RequestOptions
+        return self.__get_model().generate_content(prompt, stream=True, request_options=RequestOptions(timeout=self.timeout), generation_config=GenerationConfig(temperature=1.2))
+
+    @_retry_on_rate_limit
+    async def __request_khutbah_async(self, prompt):
+        """Send the prompt to the AI model asynchronously, throttled and retried when rate limited"""
+        from google.generativeai.types import GenerationConfig
+        from google.generativeai.types.helper_types import RequestOptions
+        async with self._rate_limiter:
+            response = await self.__get_model().generate_content_async(prompt, request_options=RequestOptions(timeout=self.timeout), generation_config=GenerationConfig(temperature=1.2))
+        return response.text
+
+    def __stream_khutbah(self, topic, length, tone, language, task_id):
+        """Generate khutbah content using AI, yielding the cleaned text as it streams in"""
+        cache_key = self.__cache_key(topic, length, tone, language)
+        markdown_text = self.__cache_get(self._cache, cache_key)
+        if markdown_text:
+            logger.info("[%s] Using cached khutbah: '%s' (%s - %s)", task_id, topic, language, tone)
+            yield markdown_text
+            return
+        
+        logger.info("[%s] Generating khutbah: '%s' (%s - %s)", task_id, topic, language, tone)
+        prompt = self.__build_prompt(topic, length, tone, language)
+
+        chunks = []
+        for chunk in self.__open_stream(prompt):
+            if chunk.parts:
+                chunks.append(chunk.text)
+                yield self.__clean_markdown(''.join(chunks))
+
+        markdown_text = self.__clean_markdown(''.join(chunks))
+        if markdown_text:
+            self.__cache_put(self._cache, cache_key, markdown_text)
 
     def __generate_khutbah(self, topic, length, tone, language, task_id):
         """Generate khutbah content using AI"""
         try:
-            if self.api_key:
-                genai.configure(api_key=self.api_key)
+            cache_key = self.__cache_key(topic, length, tone, language)
+            markdown_text = self.__cache_get(self._cache, cache_key)
+            if markdown_text:
+                logger.info("[%s] Using cached khutbah: '%s' (%s - %s)", task_id, topic, language, tone)
+                return markdown_text
             
-            self.logger.info(f"[{task_id}] Generating khutbah: '{topic}' ({language} - {tone})")
-            
-            if length.lower() == 'short':
-                length = 'short (approximately 10-15 minutes)'
-            elif length.lower() == 'medium':
-                length = 'medium (approximately 15-20 minutes)'
-            elif length.lower() == 'long':
-                length = 'long (approximately 20-30 minutes)'
+            logger.info("[%s] Generating khutbah: '%s' (%s - %s)", task_id, topic, language, tone)
+            prompt = self.__build_prompt(topic, length, tone, language)
+
+            chunks = [chunk.text for chunk in self.__open_stream(prompt) if chunk.parts]
+            markdown_text = self.__clean_markdown(''.join(chunks))
+            if markdown_text:
+                self.__cache_put(self._cache, cache_key, markdown_text)
+            return markdown_text
 
-            prompt = f"You are an expert Islamic scholar in writing khutbahs. You are required to write a {length} Friday khutbah (sermon) in {language} on the topic on '{topic}' with a {tone.lower()} tone. Create a complete, well-structured Islamic khutbah that includes: 1. An appropriate title 2. Opening with praise to Allah and salutations on Prophet Muhammad (peace be upon him) 3. Introduction to the topic with relevant Quranic verses and Hadith 4. Main body with clear points, explanations, and guidance 5. Practical advice for the audience 6. Conclusion with a summary of key points 7. Closing duas (prayers) The khutbah should be scholarly yet accessible, with proper citations of Quranic verses and authentic Hadith. Write the ENTIRE khutbah in {language} only, including the explanation and translation of Quranic verses and Hadith. Only include Arabic script for Quranic verses and Hadith, followed by their translation in {language}. DO NOT mix the khutbah with other languages and copyrighted materials. DO NOT include any opening or closing remarks."
+        except Exception as e:
+            logger.error("[%s] Khutbah generation failed: %s", task_id, e)
+            return None
 
-            model = genai.GenerativeModel(self.aigc_model)
-            response = model.generate_content(prompt, request_options=RequestOptions(timeout=self.timeout), generation_config=GenerationConfig(temperature=1.2))
+    async def __generate_khutbah_async(self, topic, length, tone, language, task_id):
+        """Generate khutbah content using AI without blocking the event loop"""
+        try:
+            cache_key = self.__cache_key(topic, length, tone, language)
+            markdown_text = self.__cache_get(self._cache, cache_key)
+            if markdown_text:
+                logger.info("[%s] Using cached khutbah: '%s' (%s - %s)", task_id, topic, language, tone)
+                return markdown_text
+            
+            logger.info("[%s] Generating khutbah: '%s' (%s - %s)", task_id, topic, language, tone)
+            prompt = self.__build_prompt(topic, length, tone, language)
 
-            return self.__clean_markdown(response.text)
+            markdown_text = self.__clean_markdown(await self.__request_khutbah_async(prompt))
+            if markdown_text:
+                self.__cache_put(self._cache, cache_key, markdown_text)
+            return markdown_text
 
         except Exception as e:
-            self.logger.error(f"[{task_id}] Khutbah generation failed: {str(e)}")
+            logger.error("[%s] Khutbah generation failed: %s", task_id, e)
             return None
 
     def __khutbah_to_pdf(self, markdown_text, topic, language, task_id):
         """Convert khutbah markdown to PDF"""
         try:
-            clean_topic = re.sub(r'[^\w\-]', '_', topic)
+            if topic.isascii():
+                clean_topic = topic.translate(_FILENAME_TABLE)
+            else:
+                clean_topic = _FILENAME_SANITIZE.sub('_', topic)
             clean_filename = f"{task_id}_{clean_topic}_khutbah_{language.lower().replace(' ', '_')}"
             pdf_path = os.path.join(tempfile.gettempdir(), f"{clean_filename}.pdf")
             
-            self.logger.info(f"[{task_id}] Generating PDF: {pdf_path}")
+            logger.info("[%s] Generating PDF: %s", task_id, pdf_path)
             
-            # Initialize without TOC to avoid hierarchy issues
-            pdf = MarkdownPdf(toc_level=0)
+            # Ensure the khutbah starts with a level-1 header and use it as the title
+            if not markdown_text.startswith('# '):
+                title = f"KhutbahMaker Script ({language})"
+                processed_markdown = f"# {title}\n\n{markdown_text}"
+            else:
+                title = markdown_text.split('\n', 1)[0][2:].strip()
+                processed_markdown = markdown_text
             
-            # Process markdown to ensure proper header hierarchy
-            lines = markdown_text.split('\n')
-            processed_lines = []
+            # Reuse a previously rendered PDF if the content is identical
+            digest = hashlib.sha1(processed_markdown.encode()).hexdigest()
+            pdf_bytes = self.__cache_get(self._pdf_cache, digest)
+            if pdf_bytes:
+                logger.info("[%s] Using cached PDF", task_id)
+                with open(pdf_path, 'wb') as f:
+                    f.write(pdf_bytes)
+                return pdf_path
             
-            # Check if first line is a header, if not add one
-            if not lines or not lines[0].startswith('# '):
-                title = f"KhutbahMaker Script ({language})"
-                processed_lines.append(f"# {title}")
-                processed_lines.append("")  # Add blank line after title
-            
-            # Process the rest of the content
-            for line in lines:
-                processed_lines.append(line)
-            
-            # Join back into a single string
-            processed_markdown = '\n'.join(processed_lines)
-            
-            # Add main content section with custom CSS
-            css = """            
-            body {
-                font-family: 'Amiri', 'Segoe UI', sans-serif;
-                text-align: justify;
-                text-justify: inter-word;
-                line-height: 1.5;
-            }
-            
-            /* Arabic text specific */
-            [lang='ar'] {
-                direction: rtl;
-                font-family: 'Amiri', sans-serif;
-                font-size: 20px;
-                line-height: 1.8;
-            }
-            
-            h1 {
-                text-align: center;
-                color: #2c3e50;
-                margin-top: 1.5em;
-                margin-bottom: 0.8em;
-                font-size: 1.5em;
-                font-weight: 600;
-            }
-            
-            h2, h3, h4, h5, h6 {
-                color: #34495e;
-                margin-top: 1.5em;
-                margin-bottom: 0.8em;
-            }
-            
-            blockquote {
-                background-color: #f9f9f9;
-                border-left: 4px solid #4CAF50;
-                padding: 10px 15px;
-                margin: 15px 0;
-                font-style: italic;
-            }
-            
-            p {
-                margin: 0.8em 0;
-            }
-            """
+            from markdown_pdf import MarkdownPdf, Section
+            
+            # Initialize without TOC to avoid hierarchy issues
+            pdf = MarkdownPdf(toc_level=0)
             
             # Add the main content section - without TOC
             main_section = Section(processed_markdown, toc=False)
-            pdf.add_section(main_section, user_css=css)
+            pdf.add_section(main_section, user_css=_KHUTBAH_CSS)
             
-            # Set PDF metadata with Unicode support
+            # Set PDF metadata with Unicode support (copied, as meta is shared across MarkdownPdf instances)
+            pdf.meta = dict(pdf.meta)
             pdf.meta["title"] = title
             pdf.meta["subject"] = title
-            pdf.meta["author"] = "Ikmal Said"
-            pdf.meta["creator"] = "KhutbahMaker"
+            pdf.meta["author"] = _PDF_AUTHOR
+            pdf.meta["creator"] = _PDF_CREATOR
             
-            # Save the PDF
-            pdf.save(pdf_path)
+            # Render the PDF in memory, then cache it and write it to the output path
+            buffer = io.BytesIO()
+            pdf.save(buffer)
+            pdf_bytes = buffer.getvalue()
+            self.__cache_put(self._pdf_cache, digest, pdf_bytes)
+            
+            with open(pdf_path, 'wb') as f:
+                f.write(pdf_bytes)
             return pdf_path
 
         except Exception as e:
-            self.logger.error(f"[{task_id}] PDF generation failed: {str(e)}")
+            logger.error("[%s] PDF generation failed: %s", task_id, e)
             return None
 
+    async def _khutbah_to_pdf_async(self, markdown_text, topic, language, task_id):
+        """Convert khutbah markdown to PDF on the default executor without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.__khutbah_to_pdf, markdown_text, topic, language, task_id)
+
     def __get_taskid(self):
         """
         Generate a unique task ID for request tracking.
-        Returns a combination of timestamp and UUID to ensure uniqueness.
-        Format: YYYYMMDD_HHMMSS_UUID8
+        Returns a combination of timestamp and a short hash of the process, instance
+        and a per-instance counter to ensure uniqueness.
+        Format: YYYYMMDD_HHMMSS_HEX8
         """
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        uuid_part = str(uuid.uuid4())[:8]
-        task_id = f"{timestamp}_{uuid_part}"
-        return task_id
+        count = next(self._task_counter)
+        tag = hashlib.blake2b(f"{timestamp}{os.getpid()}{id(self)}{count}".encode(), digest_size=4).hexdigest()
+        return f"{timestamp}_{tag}"
+    
+    def __validate_params(self, topic, length, tone, language):
+        """Validate khutbah parameters before sending any request"""
+        if not topic or topic == "":
+            logger.error("Topic is required!")
+            return False
+        
+        if length.lower() not in _LENGTHS:
+            logger.error("Invalid length!")
+            return False
+        
+        if tone.lower() not in _TONES:
+            logger.error("Invalid tone!")
+            return False
+        
+        if language.lower() not in _LANGUAGES:
+            logger.error("Invalid language!")
+            return False
+        
+        return True
     
     def generate_khutbah(self, topic, length="short", tone="inspirational", language="bahasa malaysia"):
         """Generate an Islamic khutbah based on specified parameters.
         
         Parameters:
             topic (str): The main topic or theme of the khutbah
-            length (str): Desired length ('short' | 'long')
+            length (str): Desired length ('short' | 'medium' | 'long')
             tone (str): Tone of the khutbah ('scholarly' | 'inspirational' | 'practical' | 'reflective' | 'motivational' | 'educational' | 'historical' | 'narrative')
             language (str): Target language ('bahasa malaysia' | 'arabic' | 'english' | 'mandarin' | 'tamil')
         """
-        if not topic or topic == "":
-            self.logger.error("Topic is required!")
+        if not self.__validate_params(topic, length, tone, language):
             return None, None
         
-        if length.lower() not in ['short', 'medium', 'long']:
-            self.logger.error("Invalid length!")
+        task_id = self.__get_taskid()
+        logger.info("[%s] Khutbah generation task started!", task_id)
+        topic = topic.title()
+
+        try:           
+            markdown_text = self.__generate_khutbah(topic, length, tone, language, task_id)
+            if not markdown_text:
+                return None, None
+
+            pdf_file = self.__khutbah_to_pdf(markdown_text, topic, language, task_id)
+            if not pdf_file:
+                return None, None
+            
+            logger.info("[%s] Khutbah generation complete!", task_id)
+            return pdf_file, markdown_text
+            
+        except Exception as e:
+            logger.error("[%s] Khutbah generation failed: %s", task_id, e)
             return None, None
+    
+    def generate_khutbah_stream(self, topic, length="short", tone="inspirational", language="bahasa malaysia"):
+        """Generate an Islamic khutbah, yielding the text as it is written.
         
-        if tone.lower() not in ['scholarly', 'inspirational', 'practical', 'reflective', 'motivational', 'educational', 'historical', 'narrative']:
-            self.logger.error("Invalid tone!")
-            return None, None
+        Yields (None, markdown_text) while the khutbah is being generated, then (pdf_file, markdown_text)
+        once the PDF is ready. Stopping the iteration early stops the generation.
         
-        if language.lower() not in ['bahasa malaysia', 'arabic', 'english', 'mandarin', 'tamil']:
-            self.logger.error("Invalid language!")
+        Parameters:
+            topic (str): The main topic or theme of the khutbah
+            length (str): Desired length ('short' | 'medium' | 'long')
+            tone (str): Tone of the khutbah ('scholarly' | 'inspirational' | 'practical' | 'reflective' | 'motivational' | 'educational' | 'historical' | 'narrative')
+            language (str): Target language ('bahasa malaysia' | 'arabic' | 'english' | 'mandarin' | 'tamil')
+        """
+        if not self.__validate_params(topic, length, tone, language):
+            yield None, None
+            return
+        
+        task_id = self.__get_taskid()
+        logger.info("[%s] Khutbah generation task started!", task_id)
+        topic = topic.title()
+
+        try:
+            markdown_text = None
+            for markdown_text in self.__stream_khutbah(topic, length, tone, language, task_id):
+                yield None, markdown_text
+            
+            if not markdown_text:
+                yield None, None
+                return
+
+            pdf_file = self.__khutbah_to_pdf(markdown_text, topic, language, task_id)
+            if not pdf_file:
+                yield None, None
+                return
+            
+            logger.info("[%s] Khutbah generation complete!", task_id)
+            yield pdf_file, markdown_text
+            
+        except Exception as e:
+            logger.error("[%s] Khutbah generation failed: %s", task_id, e)
+            yield None, None
+    
+    async def generate_khutbah_async(self, topic, length="short", tone="inspirational", language="bahasa malaysia"):
+        """Asynchronous version of generate_khutbah, for use inside a running event loop.
+        
+        Parameters:
+            topic (str): The main topic or theme of the khutbah
+            length (str): Desired length ('short' | 'medium' | 'long')
+            tone (str): Tone of the khutbah ('scholarly' | 'inspirational' | 'practical' | 'reflective' | 'motivational' | 'educational' | 'historical' | 'narrative')
+            language (str): Target language ('bahasa malaysia' | 'arabic' | 'english' | 'mandarin' | 'tamil')
+        """
+        if not self.__validate_params(topic, length, tone, language):
             return None, None
         
         task_id = self.__get_taskid()
-        self.logger.info(f"[{task_id}] Khutbah generation task started!")
+        logger.info("[%s] Khutbah generation task started!", task_id)
         topic = topic.title()
 
         try:           
-            markdown_text = self.__generate_khutbah(topic, length, tone, language, task_id)
+            markdown_text = await self.__generate_khutbah_async(topic, length, tone, language, task_id)
             if not markdown_text:
                 return None, None
 
-            pdf_file = self.__khutbah_to_pdf(markdown_text, topic, language, task_id)
+            pdf_file = await self._khutbah_to_pdf_async(markdown_text, topic, language, task_id)
             if not pdf_file:
                 return None, None
             
-            self.logger.info(f"[{task_id}] Khutbah generation complete!")
+            logger.info("[%s] Khutbah generation complete!", task_id)
             return pdf_file, markdown_text
             
         except Exception as e:
-            self.logger.error(f"[{task_id}] Khutbah generation failed: {str(e)}")
+            logger.error("[%s] Khutbah generation failed: %s", task_id, e)
             return None, None
+    
+    def generate_khutbah_batch(self, params, limit=10):
+        """Generate multiple khutbahs concurrently.
+        
+        Parameters:
+            params (list): List of dicts with generate_khutbah arguments (topic, length, tone, language)
+            limit (int): Maximum number of concurrent requests (default: 10)
+        
+        Returns a list of (pdf_file, markdown_text) tuples in the same order as params.
+        """
+        async def run_batch():
+            semaphore = asyncio.Semaphore(limit)
+            
+            async def run_one(kwargs):
+                async with semaphore:
+                    return await self.generate_khutbah_async(**kwargs)
+            
+            return await asyncio.gather(*[run_one(kwargs) for kwargs in params])
+        
+        return list(asyncio.run(run_batch()))
         
     def start_webui(self, host: str = None, port: int = None, browser: bool = False, upload_size: str = "4MB",
                     public: bool = False, limit: int = 10, quiet: bool = False):
@@ -230,5 +535,6 @@ class KhutbahMaker:
         - quiet (bool): Enable quiet mode (default: False)
         """
         from .webui import KhutbahMakerWebUI
+        _setup_logging()
         KhutbahMakerWebUI(self, host=host, port=port, browser=browser, upload_size=upload_size,
                           public=public, limit=limit, quiet=quiet)
\ No newline at end of file
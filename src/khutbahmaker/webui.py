@@ -1,5 +1,8 @@
+import logging
 import gradio as gr
 
+logger = logging.getLogger(__name__)
+
 def KhutbahMakerWebUI(client, host: str = None, port: int = None, browser: bool = True, upload_size: str = "4MB",
                       public: bool = False, limit: int = 10, quiet: bool = True):
     """ 
@@ -80,7 +83,7 @@ def KhutbahMakerWebUI(client, host: str = None, port: int = None, browser: bool
             gr.Markdown("<center>")
 
             # Setup event handlers
-            khutbah_btn.click(fn=client.generate_khutbah, inputs=[khutbah_topic, khutbah_length, khutbah_tone, khutbah_language], outputs=[khutbah_output, khutbah_text])
+            khutbah_btn.click(fn=client.generate_khutbah_stream, inputs=[khutbah_topic, khutbah_length, khutbah_tone, khutbah_language], outputs=[khutbah_output, khutbah_text])
         
         demo.launch(
             server_name=host,
@@ -92,5 +95,5 @@ def KhutbahMakerWebUI(client, host: str = None, port: int = None, browser: bool
         )
     
     except Exception as e:
-        client.logger.error(f"{str(e)}")
+        logger.error("%s", e)
         raise
\ No newline at end of file